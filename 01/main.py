@@ -1,4 +1,20 @@
+import mmap
+import os
 import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DIGIT_MAP = {
+    'one': 1,
+    'two': 2,
+    'three': 3,
+    'four': 4,
+    'five': 5,
+    'six': 6,
+    'seven': 7,
+    'eight': 8,
+    'nine': 9
+}
 
 
 def main():
@@ -25,92 +41,312 @@ def truncate_line(line):
     return truncated_line
 
 
-def main2():
-    digit_map = {
-        'one': 1,
-        'two': 2,
-        'three': 3,
-        'four': 4,
-        'five': 5,
-        'six': 6,
-        'seven': 7,
-        'eight': 8,
-        'nine': 9
-    }
+# translate() deletion table keeping only ascii digits and newlines
+NON_DIGIT_BYTES = bytes(b for b in range(256) if not (ord('0') <= b <= ord('9') or b == ord('\n')))
 
-    with open('input.txt') as f:
-        lines = f.readlines()
 
+def digit_lines_sum(buf: bytes) -> int:
+    """
+    buf must only contain digits and newlines, sums first and last digit of every line by index
+    """
     sum_ = 0
-    results = []
+    pos = 0
 
-    for line in lines:
-        parsed_line = line.rstrip()
+    while pos < len(buf):
+        newline = buf.find(b'\n', pos)
 
-        done = False
-        for i, c in enumerate(parsed_line):
-            current_substring = parsed_line[i:]
+        if newline == -1:
+            newline = len(buf)
 
-            if current_substring[0].isnumeric():
-                break
+        if newline > pos:
+            sum_ += (buf[pos] - ord('0')) * 10 + buf[newline - 1] - ord('0')
+
+        pos = newline + 1
+
+    return sum_
+
+
+def calibration_sum_mmap(path: str = 'input.txt', start: int = 0, stop: int | None = None,
+                         chunk_size: int = 1 << 26) -> int:
+    """
+    part 1 over a memory mapped file, start and stop need to be at line boundaries.
+    reads newline aligned chunks with only the digits kept, no per-line objects
+    """
+    if os.path.getsize(path) == 0:
+        return 0
+
+    sum_ = 0
 
-            for key, value in digit_map.items():
-                if current_substring.startswith(key):
-                    parsed_line = parsed_line.replace(key, str(value), 1)
-                    done = True
-                    break
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        stop = len(mm) if stop is None else stop
 
-            if done:
+        while start < stop:
+            end = min(start + chunk_size, stop)
+
+            if end < stop:
+                newline = mm.rfind(b'\n', start, end)
+
+                if newline == -1:
+                    # a line longer than chunk_size gets a chunk of its own
+                    newline = mm.find(b'\n', end, stop)
+
+                end = newline + 1 if newline != -1 else stop
+
+            sum_ += digit_lines_sum(mm[start:end].translate(None, NON_DIGIT_BYTES))
+            start = end
+
+    return sum_
+
+
+def calibration_value_rewrite(line: str, digit_map: dict[str, int] = DIGIT_MAP) -> int:
+    parsed_line = line.rstrip()
+
+    done = False
+    for i, c in enumerate(parsed_line):
+        current_substring = parsed_line[i:]
+
+        if current_substring[0].isnumeric():
+            break
+
+        for key, value in digit_map.items():
+            if current_substring.startswith(key):
+                parsed_line = parsed_line.replace(key, str(value), 1)
+                done = True
                 break
 
-        reversed_parsed_line = parsed_line[::-1]
+        if done:
+            break
+
+    reversed_parsed_line = parsed_line[::-1]
 
-        for i, c in enumerate(reversed_parsed_line):
-            current_substring = reversed_parsed_line[i:]
+    for i, c in enumerate(reversed_parsed_line):
+        current_substring = reversed_parsed_line[i:]
 
-            if current_substring[0].isnumeric():
+        if current_substring[0].isnumeric():
+            break
+
+        for key, value in digit_map.items():
+            if current_substring.startswith(key[::-1]):
+                reversed_parsed_line = reversed_parsed_line.replace(key[::-1], str(value), 1)
                 break
 
-            for key, value in digit_map.items():
-                if current_substring.startswith(key[::-1]):
-                    reversed_parsed_line = reversed_parsed_line.replace(key[::-1], str(value), 1)
-                    break
+    reversed_parsed_line = truncate_line(reversed_parsed_line)
+
+    first_digit = int(reversed_parsed_line[-1])
+    last_digit = int(reversed_parsed_line[0])
+
+    return first_digit * 10 + last_digit
 
-        reversed_parsed_line = truncate_line(reversed_parsed_line)
 
-        first_digit = int(reversed_parsed_line[-1])
-        last_digit = int(reversed_parsed_line[0])
-        print(f"'{line.rstrip()}' {first_digit * 10 + last_digit}")
+def main2(verbose: bool = False, results_path: str | None = None):
+    with open('input.txt') as f:
+        lines = f.readlines()
+
+    sum_ = 0
+    results = []
+
+    for line in lines:
+        result = calibration_value_rewrite(line)
+
+        if verbose:
+            print(f"'{line.rstrip()}' {result}")
 
-        result = first_digit * 10 + last_digit
-        results.append(str(result))
+        if results_path is not None:
+            results.append(str(result))
 
         sum_ += result
 
     print(sum_)
 
-    with open('task2_results.txt', 'w') as f:
-        f.write('\n'.join(results))
+    if results_path is not None:
+        with open(results_path, 'w') as f:
+            f.write('\n'.join(results))
+
+
+class DigitAutomaton:
+    """
+    aho-corasick automaton over digit patterns, reports the value of the first pattern completed
+    """
+    goto: list[dict[str, int]]
+    fail: list[int]
+    output: list[int | None]
+
+    def __init__(self, patterns: dict[str, int]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+
+        for pattern, value in patterns.items():
+            state = 0
+
+            for c in pattern:
+                if c not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.goto[state][c] = len(self.goto) - 1
+
+                state = self.goto[state][c]
+
+            self.output[state] = value
+
+        queue = list(self.goto[0].values())
+
+        for state in queue:
+            for c, next_state in self.goto[state].items():
+                fail_state = self.fail[state]
+
+                while fail_state and c not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+
+                self.fail[next_state] = self.goto[fail_state].get(c, 0)
 
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[self.fail[next_state]]
 
-def compare():
-    with open('task2_results.txt') as f:
-        task2_results = f.readlines()
+                queue.append(next_state)
 
-    with open('output.txt') as f:
-        output = f.readlines()
+    def find_first(self, line: str, indices) -> int | None:
+        state = 0
+
+        for i in indices:
+            c = line[i]
+
+            while state and c not in self.goto[state]:
+                state = self.fail[state]
+
+            state = self.goto[state].get(c, 0)
+
+            if self.output[state] is not None:
+                return self.output[state]
+
+        return None
+
+
+class DigitScanner:
+    """
+    finds the first and last digit (numeric or spelled out) of a line without rewriting it.
+    the last digit is found by running an automaton over the reversed patterns from the end of the line
+    """
+    forward: DigitAutomaton
+    backward: DigitAutomaton
+
+    def __init__(self, digit_map: dict[str, int] = DIGIT_MAP):
+        patterns = {str(digit): digit for digit in range(10)} | digit_map
+        self.forward = DigitAutomaton(patterns)
+        self.backward = DigitAutomaton({pattern[::-1]: value for pattern, value in patterns.items()})
+
+    def first_digit(self, line: str) -> int | None:
+        return self.forward.find_first(line, range(len(line)))
+
+    def last_digit(self, line: str) -> int | None:
+        return self.backward.find_first(line, range(len(line) - 1, -1, -1))
+
+    def calibration_value(self, line: str) -> int:
+        return self.first_digit(line) * 10 + self.last_digit(line)
+
+
+def main2_scanner():
+    scanner = DigitScanner()
 
     with open('input.txt') as f:
-        input_ = f.readlines()
+        sum_ = sum(scanner.calibration_value(line) for line in f)
+
+    print(sum_)
+
+
+def split_at_newlines(path: str, chunks: int) -> list[tuple[int, int]]:
+    """
+    byte offsets (start, stop) splitting the file into at most chunks pieces on line boundaries
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+
+    with open(path, 'rb') as f:
+        for i in range(1, chunks):
+            target = max(size * i // chunks, offsets[-1])
+
+            if target >= size:
+                break
+
+            f.seek(target)
+            f.readline()
+            offset = f.tell()
+
+            if offset > offsets[-1] and offset < size:
+                offsets.append(offset)
+
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _calibration_sum_chunk(path: str, start: int, stop: int, spelled: bool) -> int:
+    if not spelled:
+        return calibration_sum_mmap(path, start, stop)
+
+    scanner = DigitScanner()
+    sum_ = 0
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+
+        while f.tell() < stop:
+            line = f.readline().decode().rstrip()
+
+            if line:
+                sum_ += scanner.calibration_value(line)
+
+    return sum_
+
+
+def calibration_sum_parallel(path: str = 'input.txt', workers: int | None = None, spelled: bool = False) -> int:
+    """
+    splits the file into newline aligned chunks and sums them in a process pool.
+    spelled: count spelled out digits too (part 2)
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_at_newlines(path, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_calibration_sum_chunk, path, start, stop, spelled) for start, stop in chunks]
+        return sum(future.result() for future in futures)
+
+
+def compare(implementation=calibration_value_rewrite, candidate=None, path: str = 'input.txt',
+            max_mismatches: int = 10) -> list[int]:
+    """
+    runs two per-line calibration implementations over the same input, prints the time each took
+    and the first max_mismatches differing lines. returns the indices of all differing lines
+    """
+    candidate = candidate or DigitScanner().calibration_value
+
+    with open(path) as f:
+        lines = [line.rstrip('\n') for line in f]
+
+    timings = []
+    results = []
+
+    for impl in (implementation, candidate):
+        start = time.perf_counter()
+        results.append([impl(line) for line in lines])
+        timings.append(time.perf_counter() - start)
+
+    for impl, timing in zip((implementation, candidate), timings):
+        print(f'{getattr(impl, "__qualname__", impl)}: {timing * 1000:.2f} ms')
+
+    mismatches = [i for i, (a, b) in enumerate(zip(*results)) if a != b]
+
+    for i in mismatches[:max_mismatches]:
+        print(f"{i} a:{results[0][i]} b:{results[1][i]} in:{lines[i]}")
 
-    for i, line in enumerate(task2_results):
-        output_line = output[i]
+    print(f'{len(mismatches)} of {len(lines)} lines differ')
 
-        if line != output_line:
-            print(f"{i} res:{line.rstrip()} maj:{output_line.rstrip()} in:{input_[i]}")
+    return mismatches
 
 
 if __name__ == '__main__':
     main()
+    print(calibration_sum_mmap())
     main2()
+    main2_scanner()
     # compare()
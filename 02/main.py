@@ -1,7 +1,15 @@
+import random
+import re
+import tracemalloc
+from array import array
+
+
 class CubeSet:
-    red: int = 0
-    blue: int = 0
-    green: int = 0
+    __slots__ = ('red', 'green', 'blue')
+
+    red: int
+    blue: int
+    green: int
 
     def __init__(self, red=0, green=0, blue=0):
         self.red = red
@@ -36,6 +44,8 @@ class CubeSet:
 
 
 class GameConfig:
+    __slots__ = ('bag_load', 'id', 'runs')
+
     bag_load: CubeSet
     id: int
     runs: list[CubeSet]
@@ -89,6 +99,224 @@ class GameConfig:
         return game_config
 
 
+GAME_ID_PATTERN = re.compile(r'Game (\d+):')
+CUBE_PATTERN = re.compile(r'(\d+) (red|green|blue)')
+
+
+class GameSummary:
+    """
+    a game reduced to the per-colour maxima of its draws
+    """
+    id: int
+    red: int
+    green: int
+    blue: int
+
+    def __init__(self, id_: int, red=0, green=0, blue=0):
+        self.id = id_
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+    def __str__(self):
+        return f'Game {self.id}: max {self.red} red, {self.green} green, {self.blue} blue'
+
+    def is_valid(self, bag_load: CubeSet) -> bool:
+        return self.red <= bag_load.red and self.green <= bag_load.green and self.blue <= bag_load.blue
+
+    def get_power(self):
+        return self.red * self.green * self.blue
+
+    @staticmethod
+    def parse(in_: str) -> 'GameSummary':
+        """
+        same format as GameConfig.parse, without building a CubeSet per draw
+        """
+        maxima = {'red': 0, 'green': 0, 'blue': 0}
+
+        for match in CUBE_PATTERN.finditer(in_):
+            amount = int(match.group(1))
+            color = match.group(2)
+
+            if amount > maxima[color]:
+                maxima[color] = amount
+
+        return GameSummary(int(GAME_ID_PATTERN.match(in_).group(1)), **maxima)
+
+
+class PackedGameConfig:
+    """
+    GameConfig with its draws packed into one array('H'), three values (red, green, blue) per draw
+    """
+    __slots__ = ('bag_load', 'id', 'draws')
+
+    bag_load: CubeSet
+    id: int
+    draws: array
+
+    def __init__(self, bag_load: CubeSet, id_: int, draws: array):
+        self.bag_load = bag_load
+        self.id = id_
+        self.draws = draws
+
+    def __str__(self):
+        return f'Game {self.id}: {"; ".join([str(run) for run in self.runs])}'
+
+    @property
+    def runs(self) -> list[CubeSet]:
+        return [CubeSet(*self.draws[i:i + 3]) for i in range(0, len(self.draws), 3)]
+
+    def is_valid(self) -> bool:
+        red, green, blue = self.bag_load.red, self.bag_load.green, self.bag_load.blue
+
+        for i in range(0, len(self.draws), 3):
+            if self.draws[i] > red or self.draws[i + 1] > green or self.draws[i + 2] > blue:
+                return False
+
+        return True
+
+    def get_power(self):
+        return max(self.draws[0::3], default=0) * max(self.draws[1::3], default=0) * max(self.draws[2::3], default=0)
+
+    @staticmethod
+    def parse(bag_load: CubeSet, in_: str) -> 'PackedGameConfig':
+        """
+        same format as GameConfig.parse
+        """
+        game_token, runs_token = in_.split(':')
+        draws = array('H')
+
+        for run in runs_token.split(';'):
+            draw = {'red': 0, 'green': 0, 'blue': 0}
+
+            for match in CUBE_PATTERN.finditer(run):
+                draw[match.group(2)] = int(match.group(1))
+
+            draws.extend((draw['red'], draw['green'], draw['blue']))
+
+        return PackedGameConfig(bag_load, int(game_token.split(' ')[1]), draws)
+
+
+def generate_games(n_games: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    lines = []
+
+    for game_id in range(1, n_games + 1):
+        runs = []
+
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            runs.append(', '.join(f'{rng.randint(1, 20)} {color}' for color in colors))
+
+        lines.append(f'Game {game_id}: {"; ".join(runs)}')
+
+    return lines
+
+
+class _DictCubeSet:
+    """
+    reference for benchmark_memory: the original CubeSet layout with an instance __dict__
+    """
+    red: int = 0
+    blue: int = 0
+    green: int = 0
+
+    def __init__(self, red=0, green=0, blue=0):
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+
+class _DictGameConfig:
+    """
+    reference for benchmark_memory: the original GameConfig layout, a list of __dict__ backed cube sets
+    """
+    bag_load: CubeSet
+    id: int
+    runs: list[_DictCubeSet]
+
+    def __init__(self, bag_load, id_: int, runs: list[_DictCubeSet]):
+        self.bag_load = bag_load
+        self.id = id_
+        self.runs = runs
+
+    @staticmethod
+    def parse(bag_load: CubeSet, in_: str) -> '_DictGameConfig':
+        game = GameConfig.parse(bag_load, in_)
+        return _DictGameConfig(bag_load, game.id, [_DictCubeSet(run.red, run.green, run.blue) for run in game.runs])
+
+
+def benchmark_memory(n_games: int = 100_000):
+    """
+    bytes per game held by the original __dict__ based layout, the slotted GameConfig (a CubeSet per draw)
+    and PackedGameConfig (one array per game)
+    """
+    lines = generate_games(n_games)
+    bag_load = CubeSet(red=12, green=13, blue=14)
+
+    for game_type in (_DictGameConfig, GameConfig, PackedGameConfig):
+        tracemalloc.start()
+        games = [game_type.parse(bag_load, line) for line in lines]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f'{game_type.__name__}: {current / n_games:.1f} bytes per game')
+        del games
+
+
+class GameTable:
+    """
+    parsed games as columns: ids (n) and per-colour maxima (n x 3, red/green/blue) as numpy arrays
+    """
+    ids: 'numpy.ndarray'
+    maxima: 'numpy.ndarray'
+
+    def __init__(self, ids, maxima):
+        self.ids = ids
+        self.maxima = maxima
+
+    @staticmethod
+    def from_summaries(games: list[GameSummary]) -> 'GameTable':
+        import numpy as np
+
+        ids = np.array([game.id for game in games], dtype=np.int64)
+        maxima = np.array([(game.red, game.green, game.blue) for game in games], dtype=np.int64).reshape(-1, 3)
+
+        return GameTable(ids, maxima)
+
+    @staticmethod
+    def from_file(path: str = 'input.txt') -> 'GameTable':
+        with open(path) as f:
+            return GameTable.from_summaries([GameSummary.parse(line) for line in f if line.strip()])
+
+    def valid_id_sums(self, bag_loads: list[CubeSet], element_budget: int = 1 << 24) -> list[int]:
+        """
+        sum of the valid game ids for every bag load. bag loads and games are compared in blocks
+        so the intermediate comparison arrays stay below element_budget elements
+        """
+        import numpy as np
+
+        loads = np.array([(load.red, load.green, load.blue) for load in bag_loads], dtype=np.int64).reshape(-1, 3)
+        sums = np.zeros(len(loads), dtype=np.int64)
+
+        games_per_block = max(min(len(self.ids), element_budget // 3), 1)
+        loads_per_block = max(element_budget // (3 * games_per_block), 1)
+
+        for game_start in range(0, len(self.ids), games_per_block):
+            ids = self.ids[game_start:game_start + games_per_block]
+            maxima = self.maxima[game_start:game_start + games_per_block]
+
+            for load_start in range(0, len(loads), loads_per_block):
+                block = loads[load_start:load_start + loads_per_block]
+                valid = (maxima[None, :, :] <= block[:, None, :]).all(axis=2)
+                sums[load_start:load_start + loads_per_block] += valid @ ids
+
+        return [int(total) for total in sums]
+
+    def power_sum(self) -> int:
+        return int(self.maxima.prod(axis=1).sum())
+
+
 def main():
     with open('input.txt') as f:
         lines = f.readlines()
@@ -110,5 +338,25 @@ def main():
     print(f'Sum powers of all games: {sum_powers}')
 
 
+def main_fast():
+    cube_set = CubeSet(red=12, green=13, blue=14)
+
+    possible_games_id_sum = 0
+    sum_powers = 0
+
+    with open('input.txt') as f:
+        for line in f:
+            game = GameSummary.parse(line)
+
+            if game.is_valid(cube_set):
+                possible_games_id_sum += game.id
+
+            sum_powers += game.get_power()
+
+    print(f'Sum IDs of valid games: {possible_games_id_sum}')
+    print(f'Sum powers of all games: {sum_powers}')
+
+
 if __name__ == '__main__':
     main()
+    main_fast()
@@ -1,3 +1,7 @@
+import re
+from collections import deque
+from typing import Iterator
+
 adjacent_char_offets = [[-1, -1], [-1, 0], [-1, 1],
                         [0, -1], [0, 1],
                         [1, -1], [1, 0], [1, 1]]
@@ -14,177 +18,200 @@ def read_input() -> list[str]:
     return [line.strip() for line in lines]
 
 
-def has_adjacent_special_char(lines: list[str], line_index: int, char_index: int) -> bool:
-    line_limit = len(lines)
-    char_limit = len(lines[0])
+def main():
+    lines = read_input()
+    print(sum(part_numbers(lines)))
 
-    for offset in adjacent_char_offets:
-        new_line_index = line_index + offset[0]
-        new_char_index = char_index + offset[1]
 
-        if new_line_index < 0 \
-                or new_line_index >= line_limit \
-                or new_char_index < 0 \
-                or new_char_index >= char_limit:
-            continue
+class NumberSpan:
+    row: int
+    col_start: int
+    col_end: int
+    value: int
 
-        if is_special_char(lines[new_line_index][new_char_index]):
-            return True
+    def __init__(self, row: int, col_start: int, col_end: int, value: int):
+        self.row = row
+        self.col_start = col_start
+        self.col_end = col_end
+        self.value = value
 
-    return False
+    def __repr__(self):
+        return f'NumberSpan({self.row}, {self.col_start}, {self.col_end}, {self.value})'
 
+    def neighbors(self) -> list[tuple[int, int]]:
+        """
+        all positions around the span, col_end is exclusive
+        """
+        positions = [(self.row, self.col_start - 1), (self.row, self.col_end)]
 
-def get_decimal_place(line: str, char_index: int):
-    places = 0
+        for col in range(self.col_start - 1, self.col_end + 1):
+            positions.append((self.row - 1, col))
+            positions.append((self.row + 1, col))
 
-    for c in line[char_index + 1:]:
-        if c.isnumeric():
-            places += 1
-        else:
-            break
+        return positions
 
-    return places
 
+def tokenize_numbers(lines: list[str]) -> list[NumberSpan]:
+    return [NumberSpan(row, match.start(), match.end(), int(match.group()))
+            for row, line in enumerate(lines)
+            for match in re.finditer(r'\d+', line)]
 
-def has_right_neighbor_digit_with_adjacent_special_char(lines: list[str], line_index: int, char_index: int):
-    line = lines[line_index]
 
-    for idx, c in enumerate(line[char_index + 1:]):
-        if not c.isnumeric():
-            break
+def find_symbols(lines: list[str]) -> set[tuple[int, int]]:
+    return {(row, col) for row, line in enumerate(lines) for col, c in enumerate(line) if is_special_char(c)}
 
-        if has_adjacent_special_char(lines, line_index, char_index + idx + 1):
-            return True
 
-    return False
+def part_numbers(lines: list[str]) -> list[int]:
+    symbols = find_symbols(lines)
 
+    return [span.value for span in tokenize_numbers(lines)
+            if any(position in symbols for position in span.neighbors())]
 
-def main():
-    lines = read_input()
 
-    sum_ = 0
-    previous_char_relevant = False
+def build_span_index(spans: list[NumberSpan]) -> dict[tuple[int, int], int]:
+    """
+    maps every digit position to the index of the span it belongs to
+    """
+    return {(span.row, col): span_id for span_id, span in enumerate(spans) for col in range(span.col_start, span.col_end)}
+
+
+def gear_ratios(lines: list[str]) -> list[int]:
+    spans = tokenize_numbers(lines)
+    span_index = build_span_index(spans)
+    ratios = []
 
     for line_index, line in enumerate(lines):
         for char_index, c in enumerate(line):
-            print(f'line={line_index} char={char_index} c={c}'
-                  f' has_adjacent_special_char={has_adjacent_special_char(lines, line_index, char_index)}'
-                  f' decimal_place={get_decimal_place(line, char_index)}'
-                  f' has_right_neighbor_digit_with_adjacent_special_char={has_right_neighbor_digit_with_adjacent_special_char(lines, line_index, char_index)}')
+            if c != '*':
+                continue
 
-            if c.isnumeric() and (previous_char_relevant
-                                  or has_adjacent_special_char(lines, line_index, char_index)
-                                  or has_right_neighbor_digit_with_adjacent_special_char(lines, line_index,
-                                                                                         char_index)):
+            span_ids = {span_index[position] for position in
+                        ((line_index + offset[0], char_index + offset[1]) for offset in adjacent_char_offets)
+                        if position in span_index}
 
-                decimal_place = get_decimal_place(line, char_index)
-                sum_ += int(c) * (10 ** decimal_place)
-                previous_char_relevant = True
-            else:
-                previous_char_relevant = False
+            if len(span_ids) == 2:
+                span_1, span_2 = (spans[span_id] for span_id in span_ids)
+                ratios.append(span_1.value * span_2.value)
 
-    print(sum_)
+    return ratios
 
 
-def has_left_neighboring_number(line: str, char_index: int) -> bool:
-    if char_index - 1 < 0:
-        return False
+def part_number_sum_numpy(lines: list[str]) -> int:
+    """
+    part 1 without per-cell python: symbol mask dilated by adjacent_char_offets,
+    digit runs labelled and kept if any of their cells hit the dilated mask
+    """
+    import numpy as np
 
-    return line[char_index - 1].isnumeric()
+    if not lines:
+        return 0
 
+    # rows are right padded with '.' to a common width, the extra '.' column
+    # keeps digit runs from wrapping into the next row.
+    # non-ascii characters become '?', a symbol like in is_special_char
+    width = max(len(line) for line in lines) + 1
+    grid = np.frombuffer(''.join(line.ljust(width, '.') for line in lines).encode('ascii', errors='replace'),
+                         dtype=np.uint8).reshape(len(lines), width)
 
-def count_adjacent_numbers(lines: list[str], line_index: int, char_index: int) -> tuple[int, list[tuple[int, int]]]:
-    line_limit = len(lines)
-    char_limit = len(lines[0])
+    is_digit = (grid >= ord('0')) & (grid <= ord('9'))
+    symbols = ~is_digit & (grid != ord('.'))
 
-    adjacent_numbers = 0
-    positions = []
+    padded = np.pad(symbols, 1)
+    height, width = grid.shape
+    adjacent = np.zeros_like(symbols)
 
-    for offset in adjacent_char_offets:
-        char_offset = offset[1]
-        new_line_index = line_index + offset[0]
-        new_char_index = char_index + char_offset
+    for row_offset, col_offset in adjacent_char_offets:
+        adjacent |= padded[1 + row_offset:1 + row_offset + height, 1 + col_offset:1 + col_offset + width]
 
-        if new_line_index < 0 \
-                or new_line_index >= line_limit \
-                or new_char_index < 0 \
-                or new_char_index >= char_limit:
-            continue
+    digits = is_digit.ravel()
+    run_starts = digits & ~np.concatenate(([False], digits[:-1]))
+    run_ids = np.cumsum(run_starts)[digits] - 1
 
-        c = lines[new_line_index][new_char_index]
+    cell_indices = np.flatnonzero(digits)
+    start_indices = np.flatnonzero(run_starts)
+    run_lengths = np.bincount(run_ids)
 
-        if c.isnumeric() and (char_offset == -1 or not has_left_neighboring_number(lines[new_line_index], new_char_index)):
-            adjacent_numbers += 1
-            positions.append((new_line_index, new_char_index))
+    if len(run_lengths) > 0 and run_lengths.max() > 18:
+        # the digit runs would overflow int64
+        return sum(part_numbers(lines))
 
-    return adjacent_numbers, positions
+    exponents = run_lengths[run_ids] - 1 - (cell_indices - start_indices[run_ids])
 
+    run_values = np.zeros(len(start_indices), dtype=np.int64)
+    np.add.at(run_values, run_ids, (grid.ravel()[digits].astype(np.int64) - ord('0')) * 10 ** exponents)
 
-def grow_numbers(lines: list[str], positions: list[tuple[int, int]]) -> list[int, int]:
-    numbers = []
+    is_part = np.zeros(len(start_indices), dtype=bool)
+    np.logical_or.at(is_part, run_ids, adjacent.ravel()[digits])
 
-    for position in positions:
-        line_index, char_index = position
+    # summed as python ints, many large part numbers could overflow int64 too
+    return sum(int(value) for value in run_values[is_part])
 
-        current_char_index = char_index
-        current_char = lines[line_index][current_char_index]
 
-        digits = [current_char]
+def scan_window(window: list[tuple[str, list[re.Match]]]) -> tuple[list[int], list[int]]:
+    """
+    part numbers and gear ratios of the middle row of a (line, number matches) window of three rows
+    """
+    line = window[1][0]
+    numbers = []
+    ratios = []
 
-        current_char_index -= 1
-        current_char = lines[line_index][current_char_index]
+    for match in window[1][1]:
+        start = max(match.start() - 1, 0)
 
-        while current_char_index >= 0 and current_char.isnumeric():
-            digits.insert(0, current_char)
+        if any(is_special_char(c) for row_line, _ in window for c in row_line[start:match.end() + 1]):
+            numbers.append(int(match.group()))
 
-            current_char_index -= 1
-            current_char = lines[line_index][current_char_index]
+    for char_index, c in enumerate(line):
+        if c != '*':
+            continue
 
-        current_char_index = char_index + 1
-        current_char = lines[line_index][current_char_index]
+        adjacent = [int(match.group()) for _, matches in window for match in matches
+                    if match.start() - 1 <= char_index <= match.end()]
 
-        while current_char_index <= len(lines[0]) - 1 and current_char.isnumeric():
-            digits.append(current_char)
+        if len(adjacent) == 2:
+            ratios.append(adjacent[0] * adjacent[1])
 
-            current_char_index += 1
-            try:
-                current_char = lines[line_index][current_char_index]
-            except IndexError:
-                print('stopping')
+    return numbers, ratios
 
-        numbers.append(int(''.join(digits)))
 
-    return numbers
+def stream_schematic(path: str = 'input.txt') -> Iterator[tuple[list[int], list[int]]]:
+    """
+    reads the schematic row by row, only ever holding three rows, yields (part numbers, gear ratios) per row
+    """
+    empty_row = ('', [])
+    window = deque([empty_row], maxlen=3)
 
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            window.append((line, list(re.finditer(r'\d+', line))))
 
-def main2():
-    lines = read_input()
+            if len(window) == 3:
+                yield scan_window(list(window))
 
-    sum = 0
+    if len(window) >= 2:
+        window.append(empty_row)
+        yield scan_window(list(window))
 
-    for line_index, line in enumerate(lines):
-        for char_index, c in enumerate(line):
-            if c == '*':
-                adjacent_numbers, positions = count_adjacent_numbers(lines, line_index, char_index)
 
-                if adjacent_numbers != 2:
-                    continue
+def main_streaming():
+    part_number_sum = 0
+    gear_ratio_sum = 0
 
-                num_1, num_2 = grow_numbers(lines, positions)
+    for numbers, ratios in stream_schematic():
+        part_number_sum += sum(numbers)
+        gear_ratio_sum += sum(ratios)
 
-                print(f'gear at line={line_index}'
-                      f' char={char_index}'
-                      f' c={c}'
-                      f' adjacent_numbers = {adjacent_numbers}'
-                      f' positions = {positions}'
-                      f' num_1 = {num_1}'
-                      f' num_2 = {num_2}')
+    print(part_number_sum)
+    print(gear_ratio_sum)
 
-                sum += num_1 * num_2
 
-    print(sum)
+def main2():
+    lines = read_input()
+    print(sum(gear_ratios(lines)))
 
 
 if __name__ == '__main__':
     main()
     main2()
+    main_streaming()
@@ -15,9 +15,21 @@ def parse_number_str(number_str: str) -> list[int]:
     return [int(num) for num in matches]
 
 
+def to_bitmask(numbers: list[int]) -> int:
+    mask = 0
+
+    for num in numbers:
+        mask |= 1 << num
+
+    return mask
+
+
 class ScratchCard:
     winning_numbers: set[int]
     scratched_numbers: set[int]
+    winning_mask: int
+    scratched_mask: int
+    matches: int
     id: int
 
     def __str__(self):
@@ -29,12 +41,10 @@ class ScratchCard:
         return self.winning_numbers.intersection(self.scratched_numbers)
 
     def value(self) -> int:
-        winners = self.winners()
-
-        return 0 if len(winners) == 0 else 2 ** (len(winners) - 1)
+        return 0 if self.matches == 0 else 2 ** (self.matches - 1)
 
     def number_winners(self) -> int:
-        return len(self.winners())
+        return self.matches
 
     @staticmethod
     def parse(line: str) -> 'ScratchCard':
@@ -45,32 +55,54 @@ class ScratchCard:
 
         lists = tokens[1].split('|')
 
-        scratch_card.winning_numbers = set(parse_number_str(lists[0]))
-        scratch_card.scratched_numbers = set(parse_number_str(lists[1]))
+        winning_numbers = parse_number_str(lists[0])
+        scratched_numbers = parse_number_str(lists[1])
+
+        scratch_card.winning_numbers = set(winning_numbers)
+        scratch_card.scratched_numbers = set(scratched_numbers)
+
+        # match count is computed once from the bitmasks
+        scratch_card.winning_mask = to_bitmask(winning_numbers)
+        scratch_card.scratched_mask = to_bitmask(scratched_numbers)
+        scratch_card.matches = (scratch_card.winning_mask & scratch_card.scratched_mask).bit_count()
 
         return scratch_card
 
 
 class Scratcher:
     cards: list[ScratchCard]
-    card_amounts: dict[int, int] = dict()
+    card_amounts: dict[int, int]
 
     def __init__(self, cards: list[ScratchCard]):
         self.cards = cards
+        self.card_amounts = {}
 
-    def run(self):
-        for card in self.cards:
-            self.card_amounts[card.id] = 1
+    def run(self) -> int:
+        """
+        cards are assumed to be ordered by id. each card adds its amount to the following number_winners cards,
+        applied as a difference array so every card is touched once
+        """
+        self.card_amounts = {}
+        card_count = len(self.cards)
+        amount_diffs = [0] * (card_count + 1)
+        running_diff = 0
 
-        for card in self.cards:
-            card_amount = self.card_amounts[card.id]
+        for idx, card in enumerate(self.cards):
+            running_diff += amount_diffs[idx]
+            card_amount = 1 + running_diff
+            self.card_amounts[card.id] = card_amount
 
-            for i in range(card.number_winners()):
-                self.card_amounts[card.id + i + 1] += card_amount
+            number_winners = card.number_winners()
+
+            if number_winners > 0:
+                amount_diffs[idx + 1] += card_amount
+                amount_diffs[min(idx + 1 + number_winners, card_count)] -= card_amount
 
         total_cards = sum(self.card_amounts.values())
         print(f"Amount of cards: {total_cards}")
 
+        return total_cards
+
 
 def main():
     lines = read_input()
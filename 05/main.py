@@ -1,4 +1,8 @@
+import bisect
+import os
+import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 
 def read_input() -> list[str]:
@@ -50,6 +54,31 @@ class NumberMapEntry:
     def dest_range(self) -> range:
         return range(self.dest_range_start, self.dest_range_start + self.range_len)
 
+    def source_range(self) -> range:
+        return range(self.source_range_start, self.source_range_start + self.range_len)
+
+    def map_range(self, r: range) -> tuple[range | None, list[range]]:
+        """
+        maps the part of r overlapping this entry's source range, returns (mapped range, unmapped leftovers)
+        """
+        source = self.source_range()
+        start = max(r.start, source.start)
+        stop = min(r.stop, source.stop)
+
+        if start >= stop:
+            return None, [r]
+
+        offset = self.dest_range_start - self.source_range_start
+        leftovers = []
+
+        if r.start < start:
+            leftovers.append(range(r.start, start))
+
+        if stop < r.stop:
+            leftovers.append(range(stop, r.stop))
+
+        return range(start + offset, stop + offset), leftovers
+
     def __str__(self):
         return f'{self.dest_range_start} {self.source_range_start} {self.range_len}'
 
@@ -72,23 +101,230 @@ class NumberMap:
         return number_map
 
     def map_number(self, num: int) -> int:
-        val = None
         for entry in self.entries:
-            val = entry.map_number(num) or val
+            val = entry.map_number(num)
+
+            if val is not None:
+                return val
 
-        return val or num
+        return num
 
     def map_number_rev(self, num: int) -> int:
-        val = None
         for entry in self.entries:
-            val = entry.map_number_rev(num) or val
+            val = entry.map_number_rev(num)
+
+            if val is not None:
+                return val
+
+        return num
+
+    def compile(self) -> 'CompiledNumberMap':
+        return CompiledNumberMap(self.entries)
+
+    def map_ranges(self, ranges: list[range]) -> list[range]:
+        """
+        maps disjoint ranges to their images, splitting them at entry boundaries.
+        parts not covered by any entry map to themselves
+        """
+        mapped = []
+        unmapped = [r for r in ranges if len(r) > 0]
+
+        for entry in self.entries:
+            leftovers = []
+
+            for r in unmapped:
+                image, rest = entry.map_range(r)
+
+                if image is not None:
+                    mapped.append(image)
+
+                leftovers.extend(rest)
 
-        return val or num
+            unmapped = leftovers
+
+        return merge_ranges(mapped + unmapped)
 
     def __str__(self):
         return "\n".join([str(entry) for entry in self.entries])
 
 
+class CompiledNumberMap:
+    """
+    entries sorted by start in parallel arrays, one bisect per lookup
+    """
+    source_starts: list[int]
+    source_stops: list[int]
+    source_offsets: list[int]
+    dest_starts: list[int]
+    dest_stops: list[int]
+    dest_offsets: list[int]
+
+    def __init__(self, entries: list[NumberMapEntry]):
+        by_source = sorted(entries, key=lambda e: e.source_range_start)
+        self.source_starts = [e.source_range_start for e in by_source]
+        self.source_stops = [e.source_range_start + e.range_len for e in by_source]
+        self.source_offsets = [e.dest_range_start - e.source_range_start for e in by_source]
+
+        by_dest = sorted(entries, key=lambda e: e.dest_range_start)
+        self.dest_starts = [e.dest_range_start for e in by_dest]
+        self.dest_stops = [e.dest_range_start + e.range_len for e in by_dest]
+        self.dest_offsets = [e.source_range_start - e.dest_range_start for e in by_dest]
+
+    @staticmethod
+    def _lookup(starts: list[int], stops: list[int], offsets: list[int], num: int) -> int:
+        idx = bisect.bisect_right(starts, num) - 1
+
+        if idx >= 0 and num < stops[idx]:
+            return num + offsets[idx]
+
+        return num
+
+    def map_number(self, num: int) -> int:
+        return self._lookup(self.source_starts, self.source_stops, self.source_offsets, num)
+
+    def map_number_rev(self, num: int) -> int:
+        return self._lookup(self.dest_starts, self.dest_stops, self.dest_offsets, num)
+
+    def map_array(self, nums):
+        """
+        vectorized map_number over an int64 numpy array
+        """
+        import numpy as np
+
+        starts = np.asarray(self.source_starts, dtype=np.int64)
+        stops = np.asarray(self.source_stops, dtype=np.int64)
+        offsets = np.asarray(self.source_offsets, dtype=np.int64)
+
+        if len(starts) == 0:
+            return nums.copy()
+
+        idx = np.searchsorted(starts, nums, side='right') - 1
+        clipped = np.maximum(idx, 0)
+        hit = (idx >= 0) & (nums < stops[clipped])
+
+        return np.where(hit, nums + offsets[clipped], nums)
+
+    def split_range(self, r: range) -> list[tuple[range, int]]:
+        """
+        splits r at entry boundaries into consecutive (piece, offset) pairs covering all of r
+        """
+        pieces = []
+        current = r.start
+        idx = max(bisect.bisect_right(self.source_starts, current) - 1, 0)
+
+        while current < r.stop:
+            if idx < len(self.source_starts) and self.source_stops[idx] <= current:
+                idx += 1
+                continue
+
+            if idx < len(self.source_starts) and self.source_starts[idx] <= current:
+                stop = min(self.source_stops[idx], r.stop)
+                offset = self.source_offsets[idx]
+            else:
+                # gap before the next entry, identity
+                stop = min(self.source_starts[idx], r.stop) if idx < len(self.source_starts) else r.stop
+                offset = 0
+
+            pieces.append((range(current, stop), offset))
+            current = stop
+
+        return pieces
+
+
+class ComposedNumberMap:
+    """
+    several NumberMaps fused into one sorted table of (source_start, length, offset) segments.
+    numbers outside the table map to themselves
+    """
+    starts: list[int]
+    lengths: list[int]
+    offsets: list[int]
+
+    def __init__(self, segments: list[tuple[int, int, int]]):
+        self.starts = [start for start, _, _ in segments]
+        self.lengths = [length for _, length, _ in segments]
+        self.offsets = [offset for _, _, offset in segments]
+
+    @staticmethod
+    def compose(maps: list['NumberMap']) -> 'ComposedNumberMap':
+        upper = max((
+            max(entry.source_range_start, entry.dest_range_start) + entry.range_len
+            for map in maps for entry in map.entries
+        ), default=0)
+        segments = [(0, upper, 0)] if upper > 0 else []
+
+        for map in maps:
+            compiled = map.compile()
+            composed = []
+
+            for start, length, offset in segments:
+                image_start = start + offset
+
+                for piece, piece_offset in compiled.split_range(range(image_start, image_start + length)):
+                    segment_start = start + piece.start - image_start
+                    segment_offset = offset + piece_offset
+
+                    if composed and composed[-1][2] == segment_offset \
+                            and composed[-1][0] + composed[-1][1] == segment_start:
+                        prev_start, prev_length, _ = composed[-1]
+                        composed[-1] = (prev_start, prev_length + len(piece), segment_offset)
+                    else:
+                        composed.append((segment_start, len(piece), segment_offset))
+
+            segments = composed
+
+        return ComposedNumberMap(segments)
+
+    def segments(self) -> list[tuple[int, int, int]]:
+        return list(zip(self.starts, self.lengths, self.offsets))
+
+    def map_number(self, num: int) -> int:
+        idx = bisect.bisect_right(self.starts, num) - 1
+
+        if idx >= 0 and num < self.starts[idx] + self.lengths[idx]:
+            return num + self.offsets[idx]
+
+        return num
+
+    def map_numbers(self, nums) -> list[int]:
+        return [self.map_number(num) for num in nums]
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self.segments(), f)
+
+    @staticmethod
+    def load(path: str) -> 'ComposedNumberMap':
+        with open(path, 'rb') as f:
+            return ComposedNumberMap(pickle.load(f))
+
+    def __str__(self):
+        return "\n".join(f'{start} {length} {offset}' for start, length, offset in self.segments())
+
+
+def merge_ranges(ranges: list[range]) -> list[range]:
+    merged: list[range] = []
+
+    for r in sorted(ranges, key=lambda r: r.start):
+        if merged and r.start <= merged[-1].stop:
+            if r.stop > merged[-1].stop:
+                merged[-1] = range(merged[-1].start, r.stop)
+            continue
+
+        merged.append(r)
+
+    return merged
+
+
+def find_min_location(seeds_ranges: list[range], maps: list['NumberMap']) -> int:
+    ranges = merge_ranges(seeds_ranges)
+
+    for map in maps:
+        ranges = map.map_ranges(ranges)
+
+    return min(r.start for r in ranges)
+
+
 def parse_seeds(line: str) -> list[range]:
     seeds = parse_number_line(line)
     seed_ranges = []
@@ -99,6 +335,76 @@ def parse_seeds(line: str) -> list[range]:
     return seed_ranges
 
 
+def map_array(nums, maps: list[NumberMap]):
+    compiled_maps = [map.compile() for map in maps]
+
+    for compiled in compiled_maps:
+        nums = compiled.map_array(nums)
+
+    return nums
+
+
+def find_min_location_brute_force(seeds_ranges: list[range], maps: list[NumberMap],
+                                  chunk_size: int = 1 << 22) -> int:
+    """
+    maps every single seed with numpy, chunk_size seeds at a time to keep memory bounded
+    """
+    import numpy as np
+
+    compiled_maps = [map.compile() for map in maps]
+    min_location = None
+
+    for seed_range in seeds_ranges:
+        for chunk_start in range(seed_range.start, seed_range.stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, seed_range.stop)
+            nums = np.arange(chunk_start, chunk_stop, dtype=np.int64)
+
+            for compiled in compiled_maps:
+                nums = compiled.map_array(nums)
+
+            chunk_min = int(nums.min())
+
+            if min_location is None or chunk_min < min_location:
+                min_location = chunk_min
+
+    return min_location
+
+
+def shard_ranges(ranges: list[range], shard_count: int) -> list[range]:
+    total = sum(len(r) for r in ranges)
+    shard_size = max(-(-total // shard_count), 1)
+    shards = []
+
+    for r in ranges:
+        for start in range(r.start, r.stop, shard_size):
+            shards.append(range(start, min(start + shard_size, r.stop)))
+
+    return shards
+
+
+_worker_maps: list[NumberMap] = []
+
+
+def _init_worker(maps: list[NumberMap]):
+    global _worker_maps
+    _worker_maps = maps
+
+
+def _find_min_location_in_shard(shard: range) -> int:
+    return find_min_location_brute_force([shard], _worker_maps)
+
+
+def find_min_location_parallel(seeds_ranges: list[range], maps: list[NumberMap], workers: int | None = None) -> int:
+    """
+    brute force search with the seed ranges split into shards over a process pool
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_ranges(seeds_ranges, workers * 4)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(maps,)) as executor:
+        return min(executor.map(_find_min_location_in_shard, shards))
+
+
 def main():
     lines = read_input()
 
@@ -130,25 +436,8 @@ def main():
 
     assert len(maps) == 7
 
-    location_ranges = maps[-1].entries
-
-    dest_ranges = [location_range.dest_range() for location_range in location_ranges]
-    dest_ranges = sorted(dest_ranges, key=lambda r: r.stop)
-
-    for dest_range in dest_ranges:
-        print(f'starting with range {dest_range}')
-        for i in dest_range:
-            possible_seed = i
-
-            if i % 10000 == 0:
-                print(i)
-
-            for map in reversed(maps):
-                possible_seed = map.map_number_rev(possible_seed)
-
-            for seed_range in seeds_ranges:
-                if possible_seed in seed_range:
-                    raise ValueError(f'we got em: {i}')
+    min_location = find_min_location(seeds_ranges, maps)
+    print(f'Lowest location: {min_location}')
 
     # naive solution
 
@@ -1,4 +1,7 @@
+import math
 import re
+import time
+from typing import Iterator
 
 
 class Race:
@@ -21,15 +24,46 @@ class Race:
 
         return time_to_move * speed
 
-    def get_winning_times(self) -> list[int]:
-        winning_times = []
+    def get_winning_times(self) -> Iterator[int]:
         for time in range(self.time):
             distance = self.get_distance_traveled(time)
 
             if distance > self.record_distance:
-                winning_times.append(time)
+                yield time
 
-        return winning_times
+    def get_winning_bounds(self) -> tuple[int, int] | None:
+        """
+        first and last winning hold time (inclusive), solving t * (T - t) > D exactly
+        """
+        discriminant = self.time * self.time - 4 * self.record_distance
+
+        if discriminant <= 0:
+            return None
+
+        first = max((self.time - math.isqrt(discriminant)) // 2, 0)
+
+        # isqrt rounds down, nudge onto the exact boundary
+        while first > 0 and self.get_distance_traveled(first - 1) > self.record_distance:
+            first -= 1
+
+        while first <= self.time // 2 and self.get_distance_traveled(first) <= self.record_distance:
+            first += 1
+
+        last = self.time - first
+
+        if first > last:
+            return None
+
+        return first, last
+
+    def count_winning_times(self) -> int:
+        bounds = self.get_winning_bounds()
+
+        if bounds is None:
+            return 0
+
+        first, last = bounds
+        return last - first + 1
 
 
 def read_input() -> list[str]:
@@ -39,23 +73,42 @@ def read_input() -> list[str]:
     return [line.strip() for line in lines]
 
 
-def parse_number_line(line: str) -> list[int]:
-    return [int(num) for num in re.findall(r'\d+', line.replace(' ', ''))]
+def parse_number_line(line: str, kerned: bool = False) -> list[int]:
+    """
+    kerned: ignore the spaces between numbers, yielding a single number
+    """
+    if kerned:
+        line = line.replace(' ', '')
 
+    return [int(num) for num in re.findall(r'\d+', line)]
 
-def main():
-    lines = read_input()
 
-    times = parse_number_line(lines[0])
-    record_distances = parse_number_line(lines[1])
+def solve(lines: list[str], kerned: bool) -> int:
+    times = parse_number_line(lines[0], kerned)
+    record_distances = parse_number_line(lines[1], kerned)
 
     product_number_winning_times = 1
 
-    for time, record_distance in zip(times, record_distances):
-        race = Race(time, record_distance)
-        product_number_winning_times *= len(race.get_winning_times())
+    for time_, record_distance in zip(times, record_distances):
+        race = Race(time_, record_distance)
+        product_number_winning_times *= race.count_winning_times()
+
+    return product_number_winning_times
+
+
+def main():
+    lines = read_input()
+
+    start = time.perf_counter()
+    product_number_winning_times = solve(lines, kerned=False)
+    elapsed = time.perf_counter() - start
+    print(f'Product of the number of ways to win each race: {product_number_winning_times} '
+          f'({elapsed * 1e6:.1f} µs)')
 
-    print(f'Product of the number of ways to win each race: {product_number_winning_times}')
+    start = time.perf_counter()
+    number_winning_times = solve(lines, kerned=True)
+    elapsed = time.perf_counter() - start
+    print(f'Number of ways to win the kerned race: {number_winning_times} ({elapsed * 1e6:.1f} µs)')
 
 
 if __name__ == '__main__':
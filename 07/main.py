@@ -1,10 +1,15 @@
 import abc
+import heapq
+import struct
+import tempfile
 from collections import Counter
 from functools import total_ordering
 
 
 @total_ordering
 class Card:
+    __slots__ = ('value', 'label')
+
     value: int
     label: str
 
@@ -22,7 +27,20 @@ class Card:
         return self.value
 
     @staticmethod
-    def from_label(label: str):
+    def from_label(label: str) -> 'Card':
+        """
+        cards are interned, every label maps to one shared instance
+        """
+        card = _CARDS_BY_LABEL.get(label)
+
+        if card is None:
+            card = Card._create(label)
+            _CARDS_BY_LABEL[label] = card
+
+        return card
+
+    @staticmethod
+    def _create(label: str) -> 'Card':
         if label == 'A':
             return Card(14, label)
         elif label == 'K':
@@ -47,6 +65,8 @@ class Card:
         return self.value == other.value
 
 
+_CARDS_BY_LABEL: dict[str, Card] = {}
+
 CARDS_WITHOUT_JOKER = [
                           Card.from_label('A'),
                           Card.from_label('K'),
@@ -55,6 +75,20 @@ CARDS_WITHOUT_JOKER = [
                       ] + [Card.from_label(str(val)) for val in range(2, 9 + 1)]
 
 
+_LABELS_BY_VALUE: dict[int, str] = {card.value: card.label for card in CARDS_WITHOUT_JOKER + [Card.from_label('J')]}
+
+# sorted card counts of a hand -> hand strength
+HAND_STRENGTHS: dict[tuple[int, ...], int] = {
+    (5,): 6,
+    (4, 1): 5,
+    (3, 2): 4,
+    (3, 1, 1): 3,
+    (2, 2, 1): 2,
+    (2, 1, 1, 1): 1,
+    (1, 1, 1, 1, 1): 0,
+}
+
+
 def resolve_first_joker(hand: 'Hand') -> list['Hand']:
     possible_hands: list['Hand'] = []
 
@@ -96,7 +130,33 @@ class Hand:
 
         return possible_hands
 
-    def evaluate_hand_strength(self, evaluators: list['HandEvaluator']) -> int:
+    def count_signature(self) -> tuple[int, ...]:
+        return tuple(sorted(Counter(card.value for card in self.cards).values(), reverse=True))
+
+    def joker_count_signature(self) -> tuple[int, ...]:
+        """
+        count signature with all jokers joining the most frequent other card, which is always the best choice
+        """
+        counts = sorted(Counter(card.value for card in self.cards if card.value != 1).values(), reverse=True)
+        jokers = len(self.cards) - sum(counts)
+
+        if not counts:
+            return (jokers,)
+
+        counts[0] += jokers
+        return tuple(counts)
+
+    def evaluate_hand_strength(self, evaluators: list['HandEvaluator'],
+                               strengths: dict[tuple[int, ...], int] | None = HAND_STRENGTHS) -> int:
+        """
+        with strengths, jokers are resolved analytically. without, every joker replacement is enumerated
+        """
+        if strengths is not None:
+            strength = strengths.get(self.joker_count_signature())
+
+            if strength is not None:
+                return strength
+
         if Card.from_label('J') in self.cards:
             # shortcut for very jokery hands
             if evaluators[0].evaluate(self) or self.cards.count(Card.from_label('J')) == 4:
@@ -105,11 +165,22 @@ class Hand:
                 return 6
 
             hands = self.generate_possible_hands()
-            return max(hand.evaluate_single_hand(evaluators) for hand in hands)
+            return max(hand.evaluate_single_hand(evaluators, strengths) for hand in hands)
+
+        return self.evaluate_single_hand(evaluators, strengths)
 
-        return self.evaluate_single_hand(evaluators)
+    def evaluate_single_hand(self, evaluators: list['HandEvaluator'],
+                             strengths: dict[tuple[int, ...], int] | None = HAND_STRENGTHS) -> int:
+        """
+        looks the count signature up in strengths, the evaluators are the fallback for unknown signatures
+        (or all that's used if strengths is None)
+        """
+        if strengths is not None:
+            strength = strengths.get(self.count_signature())
+
+            if strength is not None:
+                return strength
 
-    def evaluate_single_hand(self, evaluators: list['HandEvaluator']) -> int:
         for evaluator in evaluators:
             result = evaluator.evaluate(self)
 
@@ -118,6 +189,17 @@ class Hand:
 
         assert False, f'The hand "{self}" evaluates to nothing? unlucky'
 
+    def sort_key(self, strength: int) -> int:
+        """
+        strength in the high bits, then the card values at 4 bits each, ordering like the buckets + __lt__
+        """
+        key = strength
+
+        for card in self.cards:
+            key = (key << 4) | card.value
+
+        return key
+
     def __eq__(self, other: 'Hand') -> bool:
         for card, other_card in zip(self.cards, other.cards):
             if card != other_card:
@@ -139,6 +221,55 @@ class Hand:
         return hand
 
 
+class CompactHand:
+    """
+    a hand as one bytes object of card values, jokers being 1
+    """
+    __slots__ = ('values', 'bid')
+
+    values: bytes
+    bid: int
+
+    def __init__(self, values: bytes, bid: int):
+        self.values = values
+        self.bid = bid
+
+    def __repr__(self):
+        return ''.join(_LABELS_BY_VALUE[value] for value in self.values) + f' {self.bid}'
+
+    def number_jokers(self) -> int:
+        return self.values.count(1)
+
+    def joker_count_signature(self) -> tuple[int, ...]:
+        counts = sorted(Counter(self.values.replace(b'\x01', b'')).values(), reverse=True)
+        jokers = len(self.values) - sum(counts)
+
+        if not counts:
+            return (jokers,)
+
+        counts[0] += jokers
+        return tuple(counts)
+
+    def evaluate_hand_strength(self, strengths: dict[tuple[int, ...], int] = HAND_STRENGTHS) -> int:
+        return strengths[self.joker_count_signature()]
+
+    def sort_key(self, strength: int) -> int:
+        key = strength
+
+        for value in self.values:
+            key = (key << 4) | value
+
+        return key
+
+    def to_hand(self) -> Hand:
+        return Hand([Card.from_label(_LABELS_BY_VALUE[value]) for value in self.values], self.bid)
+
+    @staticmethod
+    def from_str(s: str, bid: int) -> 'CompactHand':
+        assert len(s) == 5
+        return CompactHand(bytes(Card.from_label(label).value for label in s), bid)
+
+
 class HandEvaluator(abc.ABC):
     @abc.abstractmethod
     def evaluate(self, hand: Hand) -> int:
@@ -211,28 +342,83 @@ def main():
         cards, bid = tokens
         hands.append(Hand.from_str(cards, int(bid)))
 
-    hand_buckets: dict[int, list[Hand]] = {k: [] for k in range(len(evaluators))}
+    keyed_hands: list[tuple[int, Hand]] = []
 
     for hand in hands:
         hand_strength = hand.evaluate_hand_strength(evaluators)
         print(f'{hand}, strength: {hand_strength}')
-        hand_buckets[hand_strength].append(hand)
+        keyed_hands.append((hand.sort_key(hand_strength), hand))
 
-    total_order = []
-
-    for hand_bucket in reversed(hand_buckets.values()):
-        sorted_within_bucket = sorted(hand_bucket, reverse=True)
-        total_order.extend(sorted_within_bucket)
+    keyed_hands.sort(key=lambda keyed_hand: keyed_hand[0])
 
     winnings = 0
 
-    for idx, hand in enumerate(total_order):
-        rank = len(total_order) - idx
+    for rank, (_, hand) in enumerate(keyed_hands, start=1):
         print(f'{hand}, Rank: {rank}')
         winnings += rank * hand.bid
 
     print(f'Total winnings: {winnings}')
 
 
+RECORD = struct.Struct('<QQ')
+
+
+def _write_run(records: list[tuple[int, int]]):
+    run = tempfile.TemporaryFile()
+    records.sort()
+
+    for record in records:
+        run.write(RECORD.pack(*record))
+
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    while chunk := run.read(RECORD.size * 4096):
+        yield from RECORD.iter_unpack(chunk)
+
+
+def total_winnings_streaming(path: str = 'input.txt', max_records: int = 1_000_000) -> int:
+    """
+    parses line by line into (sort key, bid) records, spills sorted runs to disk every max_records
+    and sums the winnings over a k-way merge of the runs
+    """
+    runs = []
+    records: list[tuple[int, int]] = []
+
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+
+                if not line:
+                    continue
+
+                cards, bid = line.split(' ')
+                hand = CompactHand.from_str(cards, int(bid))
+                records.append((hand.sort_key(hand.evaluate_hand_strength()), hand.bid))
+
+                if len(records) >= max_records:
+                    runs.append(_write_run(records))
+                    records = []
+
+        records.sort()
+        winnings = 0
+
+        for rank, (_, bid) in enumerate(heapq.merge(records, *(_read_run(run) for run in runs)), start=1):
+            winnings += rank * bid
+
+        return winnings
+    finally:
+        for run in runs:
+            run.close()
+
+
+def main_streaming():
+    print(f'Total winnings (streaming): {total_winnings_streaming()}')
+
+
 if __name__ == '__main__':
     main()
+    main_streaming()